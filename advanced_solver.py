@@ -4,26 +4,112 @@ This demonstrates enhanced backtracking algorithms for comparison.
 """
 import time
 import copy
+import random
+from array import array
+
+from sudoku_tables import UNIT_CELLS, peer_cells
+from transposition import zobrist_key, zobrist_hash
+from profiling import profiled
+
+# Cell indices (row * 9 + col) of each of the 27 units, as slices of the
+# shared bytes table so no per-process copy is built
+UNIT_SLICES = [slice(unit * 9, unit * 9 + 9) for unit in range(27)]
+
+RECORD_LEVELS = ('none', 'summary', 'full', 'sampled')
+# 'unpropagate' clears a propagated cell when its branch fails; only
+# 'backtrack' steps count towards backtrack_count
+ACTIONS = ('place', 'backtrack', 'propagate', 'unpropagate')
+HEURISTICS = ('MRV+LCV', 'MRV+random', 'naked single', 'hidden single', 'propagation', 'backtracking')
+_ACTION_CODES = {name: code for code, name in enumerate(ACTIONS)}
+_HEURISTIC_CODES = {name: code for code, name in enumerate(HEURISTICS)}
+
+class StepLog:
+    """
+    Compact record of solver steps. Each kept step is packed into one
+    32-bit int (row, col, value, action, heuristic); how many are kept
+    depends on the record level:
+        none     nothing but the total count
+        summary  per-action counts only
+        full     every step
+        sampled  every `sample_every`-th step, plus per-action counts
+    """
+    def __init__(self, record='full', sample_every=100):
+        if record not in RECORD_LEVELS:
+            raise ValueError(f"Unknown record level: {record}")
+        self.record = record
+        self.sample_every = max(1, sample_every)
+        self.count = 0
+        self.action_counts = [0] * len(ACTIONS)
+        self.packed = array('I')
+    
+    def append(self, row, col, value, action, heuristic):
+        self.count += 1
+        if self.record == 'none':
+            return
+        action_code = _ACTION_CODES[action]
+        self.action_counts[action_code] += 1
+        if self.record == 'full' or (self.record == 'sampled' and (self.count - 1) % self.sample_every == 0):
+            self.packed.append(row | col << 4 | value << 8 | action_code << 12 | _HEURISTIC_CODES[heuristic] << 14)
+    
+    def __len__(self):
+        return self.count
+    
+    def __iter__(self):
+        """Yield kept steps as (row, col, value, action, heuristic) tuples."""
+        for packed in self.packed:
+            yield (packed & 0xF, packed >> 4 & 0xF, packed >> 8 & 0xF,
+                   ACTIONS[packed >> 12 & 0x3], HEURISTICS[packed >> 14 & 0x7])
+    
+    def to_dicts(self):
+        return [
+            {'row': row, 'col': col, 'value': value, 'action': action, 'heuristic': heuristic}
+            for row, col, value, action, heuristic in self
+        ]
+    
+    def summary(self):
+        if self.record == 'none':
+            return None
+        return dict(zip(ACTIONS, self.action_counts))
 
 class AdvancedSudokuSolver:
-    def __init__(self):
+    def __init__(self, value_order='lcv', seed=None, transposition_table=None):
+        # value_order: 'lcv' (least constraining first) or 'random' (seeded shuffle)
+        # transposition_table: optional TranspositionTable, may be shared
+        # between solvers and searches
+        self.value_order = value_order
+        self.transposition_table = transposition_table
+        self.zobrist = 0
+        self.rng = random.Random(seed)
+        self.heuristic_name = 'MRV+random' if value_order == 'random' else 'MRV+LCV'
         self.backtrack_count = 0
         self.constraint_checks = 0
         self.start_time = 0
-        self.solving_steps = []
+        self.solving_steps = StepLog()
+        self.propagated_cells = 0
+        self.searched_cells = 0
         
-    def solve_with_heuristics(self, grid):
+    def solve_with_heuristics(self, grid, record='full', sample_every=100):
         """
         Solve Sudoku using MRV (Minimum Remaining Values) and 
         LCV (Least Constraining Value) heuristics
+        
+        record controls which steps are kept and returned: 'none',
+        'summary' (per-action counts), 'full' or 'sampled' (every
+        sample_every-th step)
         """
         self.backtrack_count = 0
         self.constraint_checks = 0
-        self.solving_steps = []
+        self.solving_steps = StepLog(record, sample_every)
+        self.propagated_cells = 0
+        self.searched_cells = 0
         self.start_time = time.time()
         
         # Create a working copy
         working_grid = [row[:] for row in grid]
+        table_counters = None
+        if self.transposition_table is not None:
+            self.zobrist = zobrist_hash(working_grid)
+            table_counters = self.transposition_table.counters()
         
         # Solve using enhanced backtracking
         success = self._solve_with_mrv_lcv(working_grid)
@@ -37,15 +123,116 @@ class AdvancedSudokuSolver:
                 'backtrack_count': self.backtrack_count,
                 'constraint_checks': self.constraint_checks,
                 'solving_time': solving_time,
-                'steps': len(self.solving_steps)
+                'steps': len(self.solving_steps),
+                'step_summary': self.solving_steps.summary(),
+                'propagated_cells': self.propagated_cells,
+                'searched_cells': self.searched_cells,
+                'transposition': self.transposition_table.stats(since=table_counters) if self.transposition_table else None
             },
-            'steps': self.solving_steps
+            'record': record,
+            'steps': self.solving_steps.to_dicts()
         }
     
+    def count_solutions(self, grid, limit=2):
+        """
+        Count solutions of a puzzle, stopping once `limit` are found
+        (limit=2 is a uniqueness check)
+        """
+        self.backtrack_count = 0
+        self.constraint_checks = 0
+        self.solving_steps = StepLog('none')
+        self.propagated_cells = 0
+        self.searched_cells = 0
+        self.start_time = time.time()
+        
+        working_grid = [row[:] for row in grid]
+        table_counters = None
+        if self.transposition_table is not None:
+            self.zobrist = zobrist_hash(working_grid)
+            table_counters = self.transposition_table.counters()
+        
+        count = self._count_with_mrv(working_grid, limit)
+        
+        return {
+            'count': count,
+            'unique': count == 1,
+            'limit_reached': count >= limit,
+            'stats': {
+                'backtrack_count': self.backtrack_count,
+                'constraint_checks': self.constraint_checks,
+                'solving_time': time.time() - self.start_time,
+                'propagated_cells': self.propagated_cells,
+                'searched_cells': self.searched_cells,
+                'transposition': self.transposition_table.stats(since=table_counters) if self.transposition_table else None
+            }
+        }
+    
+    def _count_with_mrv(self, grid, limit):
+        """
+        Exhaustive MRV search counting solutions up to `limit`, reusing and
+        recording transposition table results when a table is configured
+        """
+        propagated = self._propagate(grid)
+        if propagated is None:
+            return 0
+        
+        table = self.transposition_table
+        if table is not None:
+            entry = table.lookup(self.zobrist)
+            if entry is not None and (entry[1] or entry[0] >= limit):
+                self._undo_propagation(grid, propagated)
+                return min(entry[0], limit)
+        
+        cell = self._select_cell_mrv(grid)
+        if cell is None:
+            count = 1
+        else:
+            row, col = cell
+            count = 0
+            for value in self._get_possible_values(grid, row, col):
+                self._place(grid, row, col, value)
+                self.searched_cells += 1
+                count += self._count_with_mrv(grid, limit - count)
+                self._clear(grid, row, col)
+                self.backtrack_count += 1
+                if count >= limit:
+                    break
+        
+        if table is not None:
+            empty = sum(1 for r in range(9) for c in range(9) if grid[r][c] == 0)
+            table.store(self.zobrist, count, count < limit, empty)
+        
+        self._undo_propagation(grid, propagated)
+        return count
+    
+    def _place(self, grid, row, col, value):
+        grid[row][col] = value
+        if self.transposition_table is not None:
+            self.zobrist ^= zobrist_key(row * 9 + col, value)
+    
+    def _clear(self, grid, row, col):
+        if self.transposition_table is not None:
+            self.zobrist ^= zobrist_key(row * 9 + col, grid[row][col])
+        grid[row][col] = 0
+    
     def _solve_with_mrv_lcv(self, grid):
         """
-        Recursive solver using MRV and LCV heuristics
+        Recursive solver using MRV and LCV heuristics, with constraint
+        propagation run to a fixpoint before every branch
         """
+        # Fill every forced cell before branching
+        propagated = self._propagate(grid)
+        if propagated is None:
+            return False
+        
+        # Skip positions a previous search already proved dead
+        table = self.transposition_table
+        if table is not None:
+            entry = table.lookup(self.zobrist)
+            if entry is not None and entry[0] == 0 and entry[1]:
+                self._undo_propagation(grid, propagated)
+                return False
+        
         # Find the best cell using MRV heuristic
         cell = self._select_cell_mrv(grid)
         
@@ -54,40 +241,120 @@ class AdvancedSudokuSolver:
         
         row, col = cell
         
-        # Get possible values ordered by LCV heuristic
-        possible_values = self._get_values_lcv(grid, row, col)
+        # Get possible values ordered by LCV heuristic (or shuffled)
+        if self.value_order == 'random':
+            possible_values = self._get_possible_values(grid, row, col)
+            self.rng.shuffle(possible_values)
+        else:
+            possible_values = self._get_values_lcv(grid, row, col)
         
         for value in possible_values:
             self.constraint_checks += 1
             
             if self._is_valid_move(grid, row, col, value):
                 # Make the move
-                grid[row][col] = value
-                self.solving_steps.append({
-                    'row': row,
-                    'col': col,
-                    'value': value,
-                    'action': 'place',
-                    'heuristic': 'MRV+LCV'
-                })
+                self._place(grid, row, col, value)
+                self.searched_cells += 1
+                self.solving_steps.append(row, col, value, 'place', self.heuristic_name)
                 
                 # Recursively solve
                 if self._solve_with_mrv_lcv(grid):
                     return True
                 
                 # Backtrack
-                grid[row][col] = 0
+                self._clear(grid, row, col)
                 self.backtrack_count += 1
-                self.solving_steps.append({
-                    'row': row,
-                    'col': col,
-                    'value': value,
-                    'action': 'backtrack',
-                    'heuristic': 'MRV+LCV'
-                })
+                self.solving_steps.append(row, col, value, 'backtrack', self.heuristic_name)
         
+        # Record the dead position, then undo what propagation placed
+        if table is not None:
+            empty = sum(1 for r in range(9) for c in range(9) if grid[r][c] == 0)
+            table.store(self.zobrist, 0, True, empty)
+        self._undo_propagation(grid, propagated)
         return False
     
+    def _propagate(self, grid):
+        """
+        Constraint propagation: apply naked singles and hidden singles until
+        nothing changes, keeping candidate sets arc consistent with every
+        placement. Returns the cells placed, or None on a contradiction
+        (in which case the grid is restored).
+        """
+        # Candidates and placements are keyed by cell index (row * 9 + col)
+        candidates = {}
+        for row in range(9):
+            for col in range(9):
+                if grid[row][col] == 0:
+                    candidates[row * 9 + col] = set(self._get_possible_values(grid, row, col))
+        
+        placed = []
+        
+        def assign(cell, value, technique):
+            row, col = divmod(cell, 9)
+            self._place(grid, row, col, value)
+            del candidates[cell]
+            placed.append(cell)
+            self.propagated_cells += 1
+            self.solving_steps.append(row, col, value, 'propagate', technique)
+            
+            # Arc consistency: remove the value from every peer's domain
+            for peer in peer_cells(cell):
+                peer_candidates = candidates.get(peer)
+                if peer_candidates is not None and value in peer_candidates:
+                    self.constraint_checks += 1
+                    peer_candidates.discard(value)
+                    if not peer_candidates:
+                        return False
+            return True
+        
+        changed = True
+        while changed:
+            changed = False
+            
+            # Naked singles: cells with a single remaining candidate
+            for cell in list(candidates):
+                cell_candidates = candidates.get(cell)
+                if cell_candidates is None:
+                    continue
+                if not cell_candidates:
+                    self._undo_propagation(grid, placed)
+                    return None
+                if len(cell_candidates) == 1:
+                    if not assign(cell, next(iter(cell_candidates)), 'naked single'):
+                        self._undo_propagation(grid, placed)
+                        return None
+                    changed = True
+            
+            # Hidden singles: values with a single possible cell in a unit
+            for unit_slice in UNIT_SLICES:
+                unit = UNIT_CELLS[unit_slice]
+                present = {grid[cell // 9][cell % 9] for cell in unit}
+                for value in range(1, 10):
+                    if value in present:
+                        continue
+                    spots = [cell for cell in unit
+                             if cell in candidates and value in candidates[cell]]
+                    if not spots:
+                        self._undo_propagation(grid, placed)
+                        return None
+                    if len(spots) == 1:
+                        if not assign(spots[0], value, 'hidden single'):
+                            self._undo_propagation(grid, placed)
+                            return None
+                        present.add(value)
+                        changed = True
+        
+        return placed
+    
+    def _undo_propagation(self, grid, placed):
+        """
+        Clear cells placed by propagation, recording them as unpropagate steps
+        """
+        for cell in reversed(placed):
+            row, col = divmod(cell, 9)
+            self.solving_steps.append(row, col, grid[row][col], 'unpropagate', 'propagation')
+            self._clear(grid, row, col)
+    
     def _select_cell_mrv(self, grid):
         """
         MRV Heuristic: Select the empty cell with the fewest possible values
@@ -193,7 +460,43 @@ class AdvancedSudokuSolver:
                     return False
         
         return True
+    
+    def logical_solve_path(self, grid, solution):
+        """
+        Ordered deductions from the givens to the solution, as a tuple of
+        (row, col, value, technique). Where propagation stalls, the MRV
+        cell is filled from the solution and recorded with technique
+        'solution' before propagation resumes.
+        """
+        working_grid = [row[:] for row in grid]
+        path = []
+        
+        while True:
+            self.solving_steps = StepLog('full')
+            if self._propagate(working_grid) is None:
+                break
+            path.extend(
+                (row, col, value, heuristic)
+                for row, col, value, action, heuristic in self.solving_steps if action == 'propagate'
+            )
+            
+            cell = self._select_cell_mrv(working_grid)
+            if cell is None:
+                break
+            row, col = cell
+            working_grid[row][col] = solution[row][col]
+            path.append((row, col, solution[row][col], 'solution'))
+        
+        # Only reached with an inconsistent solution; finish from it directly
+        for row in range(9):
+            for col in range(9):
+                if working_grid[row][col] == 0:
+                    path.append((row, col, solution[row][col], 'solution'))
+        
+        self.solving_steps = StepLog()
+        return tuple(path)
 
+@profiled()
 def compare_algorithms(puzzle):
     """
     Compare basic backtracking vs MRV+LCV heuristics
@@ -207,7 +510,7 @@ def compare_algorithms(puzzle):
         
         # Test advanced heuristics
         advanced_solver = AdvancedSudokuSolver()
-        advanced_result = advanced_solver.solve_with_heuristics([row[:] for row in puzzle])
+        advanced_result = advanced_solver.solve_with_heuristics([row[:] for row in puzzle], record='summary')
         
         # Handle the tuple return from basic visualizer
         if isinstance(basic_data, tuple) and len(basic_data) >= 2:
@@ -215,7 +518,7 @@ def compare_algorithms(puzzle):
         else:
             basic_steps = []
         
-        advanced_steps = advanced_result.get('steps', [])
+        advanced_steps = advanced_result.get('stats', {}).get('steps', 0)
         
         basic_backtrack_count = 0
         if basic_steps:
@@ -228,7 +531,7 @@ def compare_algorithms(puzzle):
                 'solving_time': 0
             },
             'advanced': advanced_result.get('stats', {}),
-            'improvement_factor': len(basic_steps) / len(advanced_steps) if advanced_steps and len(advanced_steps) > 0 else 1
+            'improvement_factor': len(basic_steps) / advanced_steps if advanced_steps > 0 else 1
         }
     except Exception as e:
         return {
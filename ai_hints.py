@@ -1,8 +1,24 @@
 import os
 import random
+import logging
+import threading
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+
+from advanced_solver import AdvancedSudokuSolver
 
 client = None
 
+# Upstream calls run on a dedicated executor so a slow OpenAI response can
+# hold the request for at most AI_HINT_TIMEOUT seconds. At most
+# AI_HINT_MAX_IN_FLIGHT calls run at once per worker process; beyond that,
+# or past the deadline, the local hint is returned straight away.
+AI_HINT_TIMEOUT = float(os.environ.get("AI_HINT_TIMEOUT", "5"))
+AI_HINT_MAX_IN_FLIGHT = int(os.environ.get("AI_HINT_MAX_IN_FLIGHT", "8"))
+
+_llm_executor = ThreadPoolExecutor(max_workers=AI_HINT_MAX_IN_FLIGHT, thread_name_prefix="ai-hint")
+_llm_slots = threading.BoundedSemaphore(AI_HINT_MAX_IN_FLIGHT)
+
 def initialize_openai():
     
     global client
@@ -12,18 +28,23 @@ def initialize_openai():
             from config import OPENAI_API_KEY
             api_key = OPENAI_API_KEY
         except ImportError:
+            api_key = None
+        
+        # Fall back to the environment when config.py still has the placeholder
+        if not api_key or api_key == "your_openai_api_key_here":
             api_key = os.environ.get("OPENAI_API_KEY")
         
         if api_key and api_key != "your_openai_api_key_here":
             from openai import OpenAI
-            client = OpenAI(api_key=api_key)
+            # No retries: a retry could never finish inside the hint deadline
+            client = OpenAI(api_key=api_key, timeout=AI_HINT_TIMEOUT, max_retries=0)
             return True
         return False
     except Exception as e:
         print(f"OpenAI initialization failed: {e}")
         return False
 
-def generate_hint(puzzle, current_state, difficulty):
+def generate_hint(puzzle, current_state, difficulty, solution=None):
     """
     Generate an AI-powered hint for the current Sudoku puzzle.
     
@@ -31,6 +52,8 @@ def generate_hint(puzzle, current_state, difficulty):
         puzzle: The original puzzle
         current_state: The current state of the puzzle
         difficulty: The difficulty level of the puzzle
+        solution: The puzzle's solution; when given, forced cells are looked
+            up on the precomputed hint chain instead of rescanning the grid
     
     Returns:
         A hint object with row, col, and explanation
@@ -40,6 +63,27 @@ def generate_hint(puzzle, current_state, difficulty):
         if client is None:
             initialize_openai()
         
+        if solution and puzzle:
+            step = next_chain_step(get_hint_chain(puzzle, solution), current_state, solution)
+            if step is None:
+                return {"hint_type": "complete", "message": "The puzzle is already complete!"}
+            kind, row, col, value, technique = step
+            if kind == 'step' and technique == 'naked single':
+                return {
+                    'hint_type': 'straightforward',
+                    'row': row,
+                    'col': col,
+                    'number': value,
+                    'message': f"Cell at row {row+1}, column {col+1} can only be {value} based on current constraints."
+                }
+            if kind == 'step' and technique == 'hidden single':
+                return {
+                    'hint_type': 'straightforward',
+                    'row': row,
+                    'col': col,
+                    'number': value,
+                    'message': f"Cell at row {row+1}, column {col+1} is the only place left for {value} in its row, column or box."
+                }
         
         empty_cells = []
         for i in range(9):
@@ -107,6 +151,57 @@ def generate_hint(puzzle, current_state, difficulty):
             'message': f"Unable to generate hint: {str(e)}"
         }
 
+@lru_cache(maxsize=1024)
+def _cached_hint_chain(puzzle_key, solution_key):
+    puzzle = [list(puzzle_key[r * 9:r * 9 + 9]) for r in range(9)]
+    solution = [list(solution_key[r * 9:r * 9 + 9]) for r in range(9)]
+    return AdvancedSudokuSolver().logical_solve_path(puzzle, solution)
+
+def _grid_key(grid):
+    """Flatten a 9x9 grid of digits into 81 bytes, or raise ValueError."""
+    try:
+        if len(grid) != 9 or any(len(row) != 9 for row in grid):
+            raise ValueError
+        key = bytes(cell for row in grid for cell in row)
+    except (TypeError, ValueError):
+        raise ValueError("Expected a 9x9 grid of digits 0-9") from None
+    if max(key) > 9:
+        raise ValueError("Expected a 9x9 grid of digits 0-9")
+    return key
+
+def get_hint_chain(puzzle, solution):
+    """
+    Get the logical solve path for a puzzle, computed on first use and
+    cached per (puzzle, solution). `puzzle` must be the original givens,
+    not the player's current state, or every move misses the cache.
+    Raises ValueError for malformed grids or an incomplete solution.
+    """
+    puzzle_key = _grid_key(puzzle)
+    solution_key = _grid_key(solution)
+    if 0 in solution_key:
+        raise ValueError("Solution must be complete")
+    return _cached_hint_chain(puzzle_key, solution_key)
+
+def next_chain_step(chain, current_state, solution):
+    """
+    Find the next hint for the player's current state.
+    
+    Returns ('mistake', row, col, value, None) for the first filled cell that
+    disagrees with the solution, ('step', row, col, value, technique) for the
+    first deduction on the path not yet filled in, or None when complete.
+    """
+    for row in range(9):
+        for col in range(9):
+            value = current_state[row][col]
+            if value != 0 and value != solution[row][col]:
+                return ('mistake', row, col, solution[row][col], None)
+    
+    for row, col, value, technique in chain:
+        if current_state[row][col] == 0:
+            return ('step', row, col, value, technique)
+    
+    return None
+
 def generate_basic_hint(row, col, valid_nums):
     """Generate a basic hint when OpenAI is not available."""
     techniques = [
@@ -183,16 +278,41 @@ def format_puzzle_for_ai(grid):
     return result
 
 def generate_ai_hint(puzzle_str, hint_context, difficulty, valid_nums):
-    """Generate a hint using OpenAI's API."""
+    """
+    Generate a hint using OpenAI's API, falling back to a basic hint when the
+    upstream is unavailable, too slow, or already at its concurrency cap.
+    """
+    row, col = hint_context["row"] - 1, hint_context["col"] - 1
+    if not client:
+        return generate_basic_hint(row, col, valid_nums)
+    
+    if not _llm_slots.acquire(blocking=False):
+        logging.warning("AI hint skipped: %d upstream calls already in flight", AI_HINT_MAX_IN_FLIGHT)
+        return dict(generate_basic_hint(row, col, valid_nums), fallback="busy")
+    
     try:
-        if not client:
-            return generate_basic_hint(hint_context["row"] - 1, hint_context["col"] - 1, valid_nums)
-            
-       
-        hint_level = "subtle" if difficulty in ["hard", "expert"] else "medium"
-        
-        
-        prompt = f"""You are a Sudoku expert helping a player. Here's the current state of their Sudoku puzzle:
+        future = _llm_executor.submit(_request_ai_hint, puzzle_str, hint_context, difficulty)
+    except Exception:
+        _llm_slots.release()
+        return generate_basic_hint(row, col, valid_nums)
+    # The slot is held until the upstream call really finishes, even if this
+    # request has already given up on it
+    future.add_done_callback(lambda _: _llm_slots.release())
+    
+    try:
+        return future.result(timeout=AI_HINT_TIMEOUT)
+    except FutureTimeout:
+        logging.warning("AI hint timed out after %.1fs", AI_HINT_TIMEOUT)
+        return dict(generate_basic_hint(row, col, valid_nums), fallback="timeout")
+    except Exception:
+        return dict(generate_basic_hint(row, col, valid_nums), fallback="error")
+
+def _request_ai_hint(puzzle_str, hint_context, difficulty):
+    """Ask OpenAI for a hint; runs on the AI hint executor."""
+    hint_level = "subtle" if difficulty in ["hard", "expert"] else "medium"
+    
+    
+    prompt = f"""You are a Sudoku expert helping a player. Here's the current state of their Sudoku puzzle:
 
 {puzzle_str}
 
@@ -209,33 +329,29 @@ The hint should help them understand the Sudoku logic that applies here.
 Return your response in the following JSON format:
 {{"hint_type": "ai", "message": "your hint here", "technique": "the name of the technique"}}"""
 
-        
-        response = client.chat.completions.create(
-            model="gpt-4o",  
-            messages=[
-                {"role": "system", "content": "You are a Sudoku expert assistant. Provide hints rather than solutions."},
-                {"role": "user", "content": prompt}
-            ],
-            response_format={"type": "json_object"},
-            max_tokens=200
-        )
-        
-        
-        response_content = response.choices[0].message.content
-        
-        
-        import json
-        if response_content is not None:
-            hint_data = json.loads(str(response_content))
-        else:
-            hint_data = {"hint_type": "basic", "message": "Try examining the rows, columns, and boxes for this cell."}
-        
-        
-        hint_data["row"] = hint_context["row"] - 1  
-        hint_data["col"] = hint_context["col"] - 1
-        
-        return hint_data
-        
-    except Exception as e:
-        
-        return generate_basic_hint(hint_context["row"] - 1, hint_context["col"] - 1, valid_nums)
\ No newline at end of file
+    
+    response = client.chat.completions.create(
+        model="gpt-4o",  
+        messages=[
+            {"role": "system", "content": "You are a Sudoku expert assistant. Provide hints rather than solutions."},
+            {"role": "user", "content": prompt}
+        ],
+        response_format={"type": "json_object"},
+        max_tokens=200
+    )
+    
+    
+    response_content = response.choices[0].message.content
+    
+    
+    import json
+    if response_content is not None:
+        hint_data = json.loads(str(response_content))
+    else:
+        hint_data = {"hint_type": "basic", "message": "Try examining the rows, columns, and boxes for this cell."}
+    
+    
+    hint_data["row"] = hint_context["row"] - 1  
+    hint_data["col"] = hint_context["col"] - 1
+    
+    return hint_data
@@ -1,10 +1,16 @@
 import os
 import logging
+import threading
 from flask import Flask, render_template, jsonify, request
 from sudoku_generator import SudokuGenerator
 from visualization import get_visualization_data
-from advanced_solver import AdvancedSudokuSolver, compare_algorithms
-from ai_hints import generate_hint
+from advanced_solver import AdvancedSudokuSolver, RECORD_LEVELS, compare_algorithms
+from portfolio import solve_portfolio, DEFAULT_TIMEOUT
+from puzzle_stock import PuzzleStock, DIFFICULTIES
+from puzzle_db import PuzzleDatabase
+from transposition import TranspositionTable
+from profiling import profile_endpoint, register_profile_routes
+from ai_hints import generate_hint, get_hint_chain, next_chain_step
 
 # Configure logging
 logging.basicConfig(level=logging.DEBUG)
@@ -13,24 +19,77 @@ logging.basicConfig(level=logging.DEBUG)
 app = Flask(__name__)
 app.secret_key = os.environ.get("SESSION_SECRET")
 
+# Admin-only download routes for ?profile=1 captures
+register_profile_routes(app)
+
 # Initialize the Sudoku generator
 sudoku_generator = SudokuGenerator()
 
+# Pre-generate a puzzle stock. Under `gunicorn --preload` this runs once in
+# the master and the workers share it copy-on-write.
+puzzle_stock = PuzzleStock.build(sudoku_generator, int(os.environ.get("PUZZLE_STOCK_SIZE", "100")))
+
+# Transposition table for solution counts, one per request thread so a long
+# count never blocks the others; repeated analysis of the same or
+# overlapping puzzles on that thread reuses earlier results
+TRANSPOSITION_TABLE_BYTES = int(os.environ.get("TRANSPOSITION_TABLE_BYTES", str(4 << 20)))
+_solution_tables = threading.local()
+
+def solution_table():
+    table = getattr(_solution_tables, 'table', None)
+    if table is None:
+        table = _solution_tables.table = TranspositionTable(TRANSPOSITION_TABLE_BYTES)
+    return table
+
+# Optional memory-mapped puzzle database (see puzzle_db.py)
+puzzle_db = PuzzleDatabase(os.environ["PUZZLE_DB_DIR"]) if os.environ.get("PUZZLE_DB_DIR") else None
+
 @app.route('/')
 def index():
     """Render the main Sudoku game page."""
     return render_template('index.html')
 
 @app.route('/new_puzzle', methods=['GET', 'POST'])
+@profile_endpoint
 def new_puzzle():
-    """Generate a new Sudoku puzzle with the requested difficulty."""
+    """Generate a new Sudoku puzzle with the requested difficulty.
+
+    When a puzzle database is configured, puzzles are drawn from it; pass
+    "number" to fetch a specific stored puzzle.
+    """
     if request.method == 'POST':
         data = request.json if request.json else {}
-        difficulty = data.get('difficulty', 'medium')
     else:
-        difficulty = request.args.get('difficulty', 'medium')
+        data = request.args
+    difficulty = data.get('difficulty', 'medium')
+    number = data.get('number')
+    if number is not None:
+        try:
+            number = int(number)
+        except (TypeError, ValueError):
+            return jsonify({'error': 'Puzzle number must be an integer'}), 400
     
-    grid, solution = sudoku_generator.generate_puzzle(difficulty)
+    if puzzle_db is not None and difficulty in DIFFICULTIES and puzzle_db.count(difficulty) > 0:
+        if number is not None:
+            stored = puzzle_db.get(difficulty, number)
+            if stored is None:
+                return jsonify({'error': 'No such puzzle'}), 404
+            grid, solution, grade = stored
+        else:
+            number, grid, solution, grade = puzzle_db.random(difficulty)
+        return jsonify({
+            'puzzle': grid,
+            'solution': solution,
+            'difficulty': difficulty,
+            'number': int(number),
+            'grade': grade
+        })
+    
+    stocked = puzzle_stock.take(difficulty)
+    if stocked:
+        grid, solution = stocked
+    else:
+        grid, solution = sudoku_generator.generate_puzzle(difficulty)
     return jsonify({
         'puzzle': grid,
         'solution': solution,
@@ -48,24 +107,43 @@ def get_hint():
     hint_type = data.get('hint_type', 'ai')  # 'ai' or 'solution'
     
     if hint_type == 'solution':
-        # Provide a direct solution hint (original behavior)
-        for i in range(9):
-            for j in range(9):
-                if current_state[i][j] == 0 or current_state[i][j] != solution[i][j]:
-                    return jsonify({
-                        'hint_type': 'solution',
-                        'row': i,
-                        'col': j,
-                        'value': solution[i][j],
-                        'message': f"The correct number for this cell is {solution[i][j]}."
-                    })
+        # Provide a direct solution hint: fix the first mistake, otherwise
+        # give the next deduction on the puzzle's logical solve path
+        if puzzle:
+            try:
+                chain = get_hint_chain(puzzle, solution)
+            except ValueError as e:
+                return jsonify({'error': str(e)}), 400
+            step = next_chain_step(chain, current_state, solution)
+            if step is not None:
+                _, row, col, value, technique = step
+                return jsonify({
+                    'hint_type': 'solution',
+                    'row': row,
+                    'col': col,
+                    'value': value,
+                    'technique': technique,
+                    'message': f"The correct number for this cell is {value}."
+                })
+        else:
+            # No original puzzle to key a chain on: first empty or wrong cell
+            for i in range(9):
+                for j in range(9):
+                    if current_state[i][j] == 0 or current_state[i][j] != solution[i][j]:
+                        return jsonify({
+                            'hint_type': 'solution',
+                            'row': i,
+                            'col': j,
+                            'value': solution[i][j],
+                            'message': f"The correct number for this cell is {solution[i][j]}."
+                        })
         
         # No hints needed, puzzle is complete
         return jsonify({'hint_type': 'complete', 'message': 'The puzzle is already complete!'})
     else:
         # Provide an AI-powered hint
         try:
-            hint = generate_hint(puzzle, current_state, difficulty)
+            hint = generate_hint(puzzle, current_state, difficulty, solution)
             return jsonify(hint)
         except Exception as e:
             logging.error(f"Error generating AI hint: {str(e)}")
@@ -92,6 +170,7 @@ def validate():
     })
 
 @app.route('/visualize_backtracking', methods=['POST'])
+@profile_endpoint
 def visualize_backtracking():
     """Generate backtracking visualization data for the current puzzle."""
     data = request.json if request.json else {}
@@ -133,8 +212,13 @@ def advanced():
     return render_template('advanced.html')
 
 @app.route('/solve_advanced', methods=['POST'])
+@profile_endpoint
 def solve_advanced():
-    """Solve puzzle using MRV+LCV heuristics and return results."""
+    """Solve puzzle using MRV+LCV heuristics and return results.
+
+    With "portfolio": true, several solver configurations race in separate
+    processes and the first answer is returned along with the winner.
+    """
     try:
         data = request.json if request.json else {}
         puzzle = data.get('puzzle', [])
@@ -142,8 +226,28 @@ def solve_advanced():
         if not puzzle:
             return jsonify({'error': 'No puzzle provided'}), 400
         
-        advanced_solver = AdvancedSudokuSolver()
-        result = advanced_solver.solve_with_heuristics(puzzle)
+        # Step recording level: none / summary / full / sampled
+        record = data.get('record', 'summary')
+        if record not in RECORD_LEVELS:
+            return jsonify({'error': f"Unknown record level: {record}"}), 400
+        try:
+            sample_every = int(data.get('sample_every', 100))
+        except (TypeError, ValueError):
+            return jsonify({'error': 'sample_every must be an integer'}), 400
+        if sample_every < 1:
+            return jsonify({'error': 'sample_every must be at least 1'}), 400
+        
+        if data.get('portfolio'):
+            try:
+                timeout = float(data.get('timeout', DEFAULT_TIMEOUT))
+            except (TypeError, ValueError):
+                return jsonify({'error': 'Timeout must be a number'}), 400
+            timeout = max(0.1, min(timeout, DEFAULT_TIMEOUT))
+            result = solve_portfolio(puzzle, timeout=timeout, record=record, sample_every=sample_every)
+        else:
+            advanced_solver = AdvancedSudokuSolver()
+            result = advanced_solver.solve_with_heuristics(
+                puzzle, record=record, sample_every=sample_every)
         
         return jsonify(result)
         
@@ -151,7 +255,34 @@ def solve_advanced():
         logging.error(f"Error in solve_advanced: {str(e)}")
         return jsonify({'error': 'Failed to solve puzzle'}), 500
 
+@app.route('/count_solutions', methods=['POST'])
+@profile_endpoint
+def count_solutions():
+    """Count the solutions of a puzzle, up to a limit (default 2: uniqueness check)."""
+    try:
+        data = request.json if request.json else {}
+        puzzle = data.get('puzzle', [])
+        
+        if not puzzle:
+            return jsonify({'error': 'No puzzle provided'}), 400
+        
+        try:
+            limit = int(data.get('limit', 2))
+        except (TypeError, ValueError):
+            return jsonify({'error': 'limit must be an integer'}), 400
+        limit = max(1, min(limit, 1000))
+        
+        solver = AdvancedSudokuSolver(transposition_table=solution_table())
+        result = solver.count_solutions(puzzle, limit)
+        
+        return jsonify(result)
+        
+    except Exception as e:
+        logging.error(f"Error in count_solutions: {str(e)}")
+        return jsonify({'error': 'Failed to count solutions'}), 500
+
 @app.route('/compare_algorithms', methods=['POST'])
+@profile_endpoint
 def compare_algorithms_route():
     """Compare basic backtracking vs MRV+LCV algorithms."""
     try:
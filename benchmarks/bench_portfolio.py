@@ -0,0 +1,79 @@
+"""
+Benchmark: single MRV+LCV engine vs. the parallel portfolio.
+
+Usage:
+    python benchmarks/bench_portfolio.py [--generated N] [--seed S]
+
+Runs a fixed set of known hard puzzles plus N generated expert puzzles
+through both modes and prints p50/p99/max wall time for each.
+"""
+import os
+import sys
+import time
+import random
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from advanced_solver import AdvancedSudokuSolver
+from portfolio import solve_portfolio
+from sudoku_generator import SudokuGenerator
+
+HARD_PUZZLES = [
+    "800000000003600000070090200050007000000045700000100030001000068008500010090000400",
+    "000000010400000000020000000000050407008000300001090000300400200050100000000806000",
+    "000000039000001005003050800008090006070002000100400000009080050020000600400700000",
+    "600008940900006100070040000200610000000000200089002000000060005000000030800001600",
+    "000000012000035000000600070700000300000400800100000000000120000080000040050000600",
+    "000001030231090000065003100678924300103050006000136700009360570006019843300000000",
+    "100007090030020008009600500005300900010080002600004000300000010040000007007000300",
+]
+
+
+def parse(line):
+    return [[int(line[r * 9 + c]) for c in range(9)] for r in range(9)]
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+
+def report(name, times):
+    print(f"{name:<12} n={len(times):<4} p50={percentile(times, 50) * 1000:8.1f}ms "
+          f"p99={percentile(times, 99) * 1000:8.1f}ms max={max(times) * 1000:8.1f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--generated', type=int, default=20)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    generator = SudokuGenerator()
+    puzzles = [parse(p) for p in HARD_PUZZLES]
+    puzzles += [generator.generate_puzzle('expert')[0] for _ in range(args.generated)]
+
+    single_times, portfolio_times, winners = [], [], {}
+    for puzzle in puzzles:
+        start = time.perf_counter()
+        AdvancedSudokuSolver().solve_with_heuristics(puzzle, record='summary')
+        single_times.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        result = solve_portfolio(puzzle)
+        portfolio_times.append(time.perf_counter() - start)
+        winner = str(result['portfolio']['winner'])
+        winners[winner] = winners.get(winner, 0) + 1
+
+    report('single', single_times)
+    report('portfolio', portfolio_times)
+    print("winners:")
+    for winner, count in sorted(winners.items(), key=lambda item: -item[1]):
+        print(f"  {count:4d}  {winner}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,93 @@
+"""
+Benchmark: gunicorn startup with and without preloading.
+
+Usage:
+    python benchmarks/bench_startup.py [--workers N] [--port P]
+
+Starts gunicorn twice (plain, then with gunicorn.conf.py preloading),
+measures time from launch until /new_puzzle first answers, and reports
+resident and proportional (shared pages split) memory per worker.
+"""
+import os
+import sys
+import time
+import signal
+import argparse
+import tempfile
+import subprocess
+import urllib.request
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def read_memory_kb(pid):
+    """Return (rss, pss) in kB for a process, from /proc."""
+    rss = pss = 0
+    with open(f"/proc/{pid}/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                rss = int(line.split()[1])
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as f:
+            for line in f:
+                if line.startswith("Pss:"):
+                    pss = int(line.split()[1])
+    except OSError:
+        pass
+    return rss, pss
+
+
+def worker_pids(master_pid):
+    with open(f"/proc/{master_pid}/task/{master_pid}/children") as f:
+        return [int(pid) for pid in f.read().split()]
+
+
+def run(label, extra_args, workers, port):
+    url = f"http://127.0.0.1:{port}/new_puzzle?difficulty=hard"
+    cmd = [sys.executable, "-m", "gunicorn", "--workers", str(workers),
+           "--bind", f"127.0.0.1:{port}", "--log-level", "warning"] + extra_args + ["main:app"]
+
+    start = time.perf_counter()
+    server = subprocess.Popen(cmd, cwd=ROOT)
+    try:
+        while True:
+            try:
+                urllib.request.urlopen(url, timeout=1).read()
+                break
+            except OSError:
+                if server.poll() is not None:
+                    raise RuntimeError(f"gunicorn exited with {server.returncode}")
+                time.sleep(0.01)
+        first_response = time.perf_counter() - start
+
+        # Let every worker boot and serve a few requests before measuring
+        time.sleep(1.0)
+        for _ in range(workers * 4):
+            urllib.request.urlopen(url, timeout=5).read()
+
+        pids = worker_pids(server.pid)
+        memory = [read_memory_kb(pid) for pid in pids]
+        rss = sum(m[0] for m in memory) / max(1, len(memory))
+        pss = sum(m[1] for m in memory) / max(1, len(memory))
+        print(f"{label:<10} first response {first_response * 1000:7.1f}ms  "
+              f"workers={len(pids)}  rss/worker={rss / 1024:6.1f}MB  pss/worker={pss / 1024:6.1f}MB")
+    finally:
+        server.send_signal(signal.SIGTERM)
+        server.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--port', type=int, default=8765)
+    args = parser.parse_args()
+
+    # gunicorn picks up ./gunicorn.conf.py by default, so the cold run
+    # points it at an empty config instead
+    with tempfile.NamedTemporaryFile(suffix='.py') as empty_config:
+        run('cold', ["--config", empty_config.name], args.workers, args.port)
+    run('preload', ["--config", os.path.join(ROOT, "gunicorn.conf.py")], args.workers, args.port)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,90 @@
+"""
+Benchmark: solution counting with and without a transposition table.
+
+Usage:
+    python benchmarks/bench_transposition.py [--max-bytes N] [--policy depth|always]
+
+Two workloads, each run with no table and with one table shared across
+the whole workload:
+  near-unique    for each unique puzzle, a uniqueness check (limit=2) on the
+                 puzzle and on every variant with one given removed, as a
+                 generator digging for a unique puzzle would
+  multi-solution repeated counts (limit=200) of sparse generated puzzles,
+                 as the analysis page does when a puzzle is re-analysed
+
+A single tree search never reaches the same position twice, so the table
+only helps when an identical count is repeated: the multi-solution
+workload runs about 2.5-3x faster with it. Near-unique dig sequences hit
+it too rarely (~0.2%) to gain anything; their timings vary by run
+between roughly 0.8x and 1.2x.
+"""
+import os
+import sys
+import time
+import random
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from advanced_solver import AdvancedSudokuSolver
+from transposition import TranspositionTable
+from sudoku_generator import SudokuGenerator
+
+UNIQUE_PUZZLES = [
+    "800000000003600000070090200050007000000045700000100030001000068008500010090000400",
+    "000000039000001005003050800008090006070002000100400000009080050020000600400700000",
+    "100007090030020008009600500005300900010080002600004000300000010040000007007000300",
+]
+
+
+def parse(line):
+    return [[int(line[r * 9 + c]) for c in range(9)] for r in range(9)]
+
+
+def near_unique_jobs():
+    jobs = []
+    for line in UNIQUE_PUZZLES:
+        puzzle = parse(line)
+        jobs.append((puzzle, 2))
+        for row in range(9):
+            for col in range(9):
+                if puzzle[row][col]:
+                    variant = [r[:] for r in puzzle]
+                    variant[row][col] = 0
+                    jobs.append((variant, 2))
+    return jobs
+
+
+def multi_solution_jobs(seed):
+    random.seed(seed)
+    generator = SudokuGenerator()
+    puzzles = [generator.generate_puzzle('expert')[0] for _ in range(5)]
+    return [(puzzle, 200) for _ in range(3) for puzzle in puzzles]
+
+
+def run(jobs, table):
+    start = time.perf_counter()
+    for puzzle, limit in jobs:
+        AdvancedSudokuSolver(transposition_table=table).count_solutions(puzzle, limit)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--max-bytes', type=int, default=1 << 22)
+    parser.add_argument('--policy', default='depth')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    for name, jobs in (('near-unique', near_unique_jobs()), ('multi-solution', multi_solution_jobs(args.seed))):
+        baseline = run(jobs, None)
+        table = TranspositionTable(args.max_bytes, args.policy)
+        with_table = run(jobs, table)
+        stats = table.stats()
+        print(f"{name:<15} jobs={len(jobs):<4} no table {baseline:7.2f}s  table {with_table:7.2f}s  "
+              f"speedup {baseline / with_table:5.2f}x  hit rate {stats['hit_rate'] * 100:5.1f}%  "
+              f"stores={stats['stores']} replacements={stats['replacements']} rejections={stats['rejections']}")
+
+
+if __name__ == '__main__':
+    main()
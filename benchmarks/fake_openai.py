@@ -0,0 +1,107 @@
+"""
+Local stand-in for the OpenAI chat completions API.
+
+Usage:
+    python benchmarks/fake_openai.py [--port 8766] [--latency 0.8] [--jitter 0.2] [--failure-rate 0.05]
+
+Point the app at it with:
+    OPENAI_API_KEY=fake OPENAI_BASE_URL=http://127.0.0.1:8766/v1
+
+Every POST to /v1/chat/completions sleeps for latency +/- jitter seconds,
+then either fails with a 500 (at the configured rate) or returns a canned
+JSON hint in the chat completion format.
+"""
+import json
+import time
+import random
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+HINT = {
+    "hint_type": "ai",
+    "message": "Look at which numbers are already used in this cell's row and box.",
+    "technique": "Elimination"
+}
+
+
+class FakeOpenAIHandler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length', 0))
+        self.rfile.read(length)
+        settings = self.server.settings
+
+        delay = max(0.0, settings['latency'] + random.uniform(-settings['jitter'], settings['jitter']))
+        time.sleep(delay)
+
+        with self.server.lock:
+            self.server.request_count += 1
+
+        if not self.path.endswith('/chat/completions'):
+            self._send(404, {"error": {"message": "Not found", "type": "invalid_request_error"}})
+        elif random.random() < settings['failure_rate']:
+            self._send(500, {"error": {"message": "Simulated upstream failure", "type": "server_error"}})
+        else:
+            self._send(200, {
+                "id": "chatcmpl-fake",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": "gpt-4o",
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": json.dumps(HINT)},
+                    "finish_reason": "stop"
+                }],
+                "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0}
+            })
+
+    def _send(self, status, body):
+        payload = json.dumps(body).encode()
+        try:
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+        except (BrokenPipeError, ConnectionResetError):
+            # The client gave up (e.g. hit its timeout) before we answered
+            pass
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_server(port=0, latency=0.8, jitter=0.2, failure_rate=0.0):
+    """Start the fake server on a background thread and return it."""
+    server = ThreadingHTTPServer(('127.0.0.1', port), FakeOpenAIHandler)
+    server.daemon_threads = True
+    server.settings = {'latency': latency, 'jitter': jitter, 'failure_rate': failure_rate}
+    server.lock = threading.Lock()
+    server.request_count = 0
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def base_url(server):
+    return f"http://127.0.0.1:{server.server_address[1]}/v1"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--port', type=int, default=8766)
+    parser.add_argument('--latency', type=float, default=0.8)
+    parser.add_argument('--jitter', type=float, default=0.2)
+    parser.add_argument('--failure-rate', type=float, default=0.05)
+    args = parser.parse_args()
+
+    server = start_server(args.port, args.latency, args.jitter, args.failure_rate)
+    print(f"Fake OpenAI listening on {base_url(server)}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,104 @@
+"""
+Check the AI hint deadline and concurrency cap against a stub upstream.
+
+Usage:
+    python benchmarks/hint_deadline.py [--timeout 0.5] [--max-in-flight 2] [--requests 8]
+
+Runs bursts of concurrent AI hint requests through the Flask app while
+the fake OpenAI server (benchmarks/fake_openai.py) is fast, slow (past
+the deadline) or failing. Prints the worst request latency and how many
+hints came from the LLM versus each local fallback, checks them against
+the expected behaviour and exits non-zero if any check fails:
+  - no request takes longer than the deadline plus --slack
+  - fast upstream: LLM hints, 'busy' only beyond the in-flight cap
+  - slow upstream: exactly cap x 'timeout', the rest 'busy'
+  - failing upstream: 'error' fallbacks, the rest 'busy'
+"""
+import os
+import sys
+import time
+import argparse
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fake_openai import start_server, base_url
+
+# No naked singles, so hints go to the LLM path
+PUZZLE = "800000000003600000070090200050007000000045700000100030001000068008500010090000400"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--timeout', type=float, default=0.5)
+    parser.add_argument('--max-in-flight', type=int, default=2)
+    parser.add_argument('--requests', type=int, default=8)
+    parser.add_argument('--slack', type=float, default=0.25, help="Allowed latency over the deadline (s)")
+    args = parser.parse_args()
+
+    fake = start_server(latency=0.05, jitter=0.0)
+    os.environ.update({
+        'OPENAI_API_KEY': 'fake',
+        'OPENAI_BASE_URL': base_url(fake),
+        'AI_HINT_TIMEOUT': str(args.timeout),
+        'AI_HINT_MAX_IN_FLIGHT': str(args.max_in_flight),
+        'PUZZLE_STOCK_SIZE': '0'
+    })
+    from app import app
+
+    grid = [[int(PUZZLE[r * 9 + c]) for c in range(9)] for r in range(9)]
+    body = {'original_puzzle': grid, 'puzzle': grid, 'difficulty': 'hard', 'hint_type': 'ai'}
+
+    def request_hint(_):
+        client = app.test_client()
+        start = time.perf_counter()
+        hint = client.post('/get_hint', json=body).get_json()
+        return time.perf_counter() - start, hint.get('fallback') or hint.get('hint_type')
+
+    # The first hint imports and creates the OpenAI client; keep that out
+    # of the measurements
+    request_hint(None)
+
+    over_cap = max(0, args.requests - args.max_in_flight)
+
+    def check_fast(outcomes):
+        return outcomes['ai'] >= 1 and set(outcomes) <= {'ai', 'busy'} and outcomes['busy'] <= over_cap
+
+    def check_slow(outcomes):
+        return (outcomes['timeout'] == min(args.requests, args.max_in_flight)
+                and outcomes['busy'] == over_cap)
+
+    def check_failing(outcomes):
+        return outcomes['error'] >= 1 and set(outcomes) <= {'error', 'busy'} and outcomes['busy'] <= over_cap
+
+    scenarios = [
+        ('fast', 0.05, 0.0, check_fast),
+        ('slow', args.timeout * 4, 0.0, check_slow),
+        ('failing', 0.05, 1.0, check_failing),
+    ]
+    failures = []
+    for name, latency, failure_rate, check in scenarios:
+        fake.settings.update(latency=latency, failure_rate=failure_rate)
+        # Let calls left over from the previous scenario finish
+        time.sleep(latency + args.timeout * 4)
+        with ThreadPoolExecutor(max_workers=args.requests) as executor:
+            results = list(executor.map(request_hint, range(args.requests)))
+        worst = max(latency for latency, _ in results)
+        outcomes = Counter(outcome for _, outcome in results)
+        passed = worst <= args.timeout + args.slack and check(outcomes)
+        print(f"{name:<8} worst {worst * 1000:7.1f}ms  deadline {args.timeout * 1000:.0f}ms  "
+              f"{dict(outcomes)}  {'ok' if passed else 'FAIL'}")
+        if not passed:
+            failures.append(name)
+
+    fake.shutdown()
+    if failures:
+        print(f"Failed scenarios: {', '.join(failures)}")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,228 @@
+"""
+Load-testing harness for the Flask app under gunicorn.
+
+Usage:
+    python benchmarks/loadtest.py --workers 1,2,4 --threads 1,4 --sessions 200 --concurrency 16
+
+For every workers x threads combination this starts gunicorn (with
+gunicorn.conf.py) against a local fake OpenAI server, replays simulated
+player sessions and prints throughput, p50/p95/p99 latency, error rate and
+fallback rate per route. Fallbacks are 200 responses that degraded: a hint
+with a 'fallback' reason or hint_type 'error'. Each session fetches a
+numbered puzzle, makes a series of moves with /validate and /get_hint calls,
+then runs /visualize_backtracking and /compare_algorithms. Puzzles come from
+a puzzle database generated from --seed before the run, and sessions are
+seeded, so every run replays the same traffic.
+"""
+import os
+import sys
+import json
+import time
+import random
+import signal
+import shutil
+import argparse
+import tempfile
+import subprocess
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from fake_openai import start_server, base_url
+from puzzle_db import append_puzzles, database_path, grade_puzzle
+from puzzle_stock import DIFFICULTIES
+from sudoku_generator import SudokuGenerator
+
+
+class Client:
+    def __init__(self, url, results):
+        self.url = url
+        self.results = results
+
+    def call(self, route, body=None, query=''):
+        request = urllib.request.Request(
+            self.url + route + query,
+            data=json.dumps(body).encode() if body is not None else None,
+            headers={'Content-Type': 'application/json'}
+        )
+        start = time.perf_counter()
+        error = False
+        data = None
+        try:
+            with urllib.request.urlopen(request, timeout=120) as response:
+                data = json.loads(response.read())
+        except (urllib.error.URLError, OSError, ValueError):
+            error = True
+        # The app answers upstream failures with a 200 and a degraded body
+        fallback = isinstance(data, dict) and bool(data.get('fallback') or data.get('hint_type') == 'error')
+        self.results.append((route, time.perf_counter() - start, error, fallback))
+        return data
+
+
+def build_puzzle_db(directory, difficulty, count, seed):
+    """Generate the fixed puzzle set every session draws from."""
+    random.seed(seed)
+    generator = SudokuGenerator()
+
+    def records():
+        for _ in range(count):
+            grid, solution = generator.generate_puzzle(difficulty)
+            yield grid, solution, grade_puzzle(grid)
+
+    append_puzzles(database_path(directory, difficulty), records())
+
+
+def run_session(client, seed, difficulty, puzzles, moves, ai_hint_rate):
+    rng = random.Random(seed)
+    number = rng.randrange(puzzles)
+    data = client.call('/new_puzzle', query=f'?difficulty={difficulty}&number={number}')
+    if not data:
+        return
+    original = data['puzzle']
+    solution = data['solution']
+    state = [row[:] for row in original]
+
+    for _ in range(moves):
+        empty = [(r, c) for r in range(9) for c in range(9) if state[r][c] == 0]
+        if not empty:
+            break
+        row, col = rng.choice(empty)
+        state[row][col] = solution[row][col]
+        client.call('/validate', {'puzzle': state, 'solution': solution})
+
+        if rng.random() < 0.3:
+            hint_type = 'ai' if rng.random() < ai_hint_rate else 'solution'
+            client.call('/get_hint', {
+                'original_puzzle': original,
+                'puzzle': state,
+                'solution': solution,
+                'difficulty': difficulty,
+                'hint_type': hint_type
+            })
+
+    client.call('/visualize_backtracking', {'puzzle': state})
+    client.call('/compare_algorithms', {'puzzle': state})
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+
+def summarize(results, elapsed):
+    routes = {}
+    for route, latency, error, fallback in results:
+        entry = routes.setdefault(route, {'latencies': [], 'errors': 0, 'fallbacks': 0})
+        entry['latencies'].append(latency)
+        entry['errors'] += int(error)
+        entry['fallbacks'] += int(fallback)
+
+    summary = {}
+    for route, entry in routes.items():
+        latencies = entry['latencies']
+        summary[route] = {
+            'requests': len(latencies),
+            'throughput': len(latencies) / elapsed,
+            'p50': percentile(latencies, 50),
+            'p95': percentile(latencies, 95),
+            'p99': percentile(latencies, 99),
+            'error_rate': entry['errors'] / len(latencies),
+            'fallback_rate': entry['fallbacks'] / len(latencies)
+        }
+    return summary
+
+
+def start_gunicorn(workers, threads, port, env):
+    cmd = [sys.executable, '-m', 'gunicorn', '--config', os.path.join(ROOT, 'gunicorn.conf.py'),
+           '--workers', str(workers), '--threads', str(threads),
+           '--bind', f'127.0.0.1:{port}', '--timeout', '120', '--log-level', 'warning', 'main:app']
+    server = subprocess.Popen(cmd, cwd=ROOT, env=env,
+                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    url = f'http://127.0.0.1:{port}'
+    while True:
+        try:
+            urllib.request.urlopen(url + '/new_puzzle', timeout=1).read()
+            return server, url
+        except OSError:
+            if server.poll() is not None:
+                raise RuntimeError(f"gunicorn exited with {server.returncode}")
+            time.sleep(0.05)
+
+
+def run_config(args, workers, threads, openai_url, db_dir):
+    env = dict(os.environ, OPENAI_API_KEY='fake', OPENAI_BASE_URL=openai_url, PUZZLE_DB_DIR=db_dir)
+    server, url = start_gunicorn(workers, threads, args.port, env)
+    try:
+        results = []
+        client = Client(url, results)
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+            futures = [
+                executor.submit(run_session, client, f"{args.seed}-{i}", args.difficulty,
+                                args.puzzles, args.moves, args.ai_hint_rate)
+                for i in range(args.sessions)
+            ]
+            for future in futures:
+                future.result()
+        elapsed = time.perf_counter() - start
+    finally:
+        server.send_signal(signal.SIGTERM)
+        server.wait()
+    return elapsed, summarize(results, elapsed)
+
+
+def print_report(workers, threads, elapsed, summary, sessions):
+    print(f"\nworkers={workers} threads={threads}  {sessions / elapsed:.1f} sessions/s over {elapsed:.1f}s")
+    print(f"  {'route':<24}{'requests':>9}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}"
+          f"{'errors':>8}{'fallback':>10}")
+    for route, stats in sorted(summary.items()):
+        print(f"  {route:<24}{stats['requests']:>9}{stats['throughput']:>9.1f}"
+              f"{stats['p50'] * 1000:>9.1f}{stats['p95'] * 1000:>9.1f}{stats['p99'] * 1000:>9.1f}"
+              f"{stats['error_rate'] * 100:>7.1f}%{stats['fallback_rate'] * 100:>9.1f}%")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--workers', default='2', help="Comma-separated gunicorn worker counts")
+    parser.add_argument('--threads', default='1', help="Comma-separated gunicorn thread counts")
+    parser.add_argument('--sessions', type=int, default=50)
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--moves', type=int, default=10)
+    parser.add_argument('--difficulty', default='easy', choices=DIFFICULTIES)
+    parser.add_argument('--puzzles', type=int, default=50, help="Size of the fixed puzzle set")
+    parser.add_argument('--ai-hint-rate', type=float, default=0.5)
+    parser.add_argument('--latency', type=float, default=0.8, help="Fake OpenAI latency (s)")
+    parser.add_argument('--jitter', type=float, default=0.2)
+    parser.add_argument('--failure-rate', type=float, default=0.05)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--port', type=int, default=8767)
+    parser.add_argument('--json', help="Also write the results to this file")
+    args = parser.parse_args()
+
+    db_dir = tempfile.mkdtemp(prefix='smartsudo-loadtest-')
+    build_puzzle_db(db_dir, args.difficulty, args.puzzles, args.seed)
+    random.seed(args.seed)
+    fake = start_server(latency=args.latency, jitter=args.jitter, failure_rate=args.failure_rate)
+
+    report = []
+    try:
+        for workers in [int(w) for w in args.workers.split(',')]:
+            for threads in [int(t) for t in args.threads.split(',')]:
+                elapsed, summary = run_config(args, workers, threads, base_url(fake), db_dir)
+                print_report(workers, threads, elapsed, summary, args.sessions)
+                report.append({'workers': workers, 'threads': threads, 'elapsed': elapsed, 'routes': summary})
+    finally:
+        fake.shutdown()
+        shutil.rmtree(db_dir, ignore_errors=True)
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
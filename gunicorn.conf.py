@@ -0,0 +1,13 @@
+# Gunicorn configuration for SmartSudo
+
+import gc
+
+# Import the app (lookup tables, puzzle stock) once in the master before
+# forking so every worker starts warm and shares those pages.
+preload_app = True
+
+
+def pre_fork(server, worker):
+    # Move preloaded objects out of the collector's generations so GC passes
+    # in the workers don't touch (and un-share) their pages.
+    gc.freeze()
@@ -0,0 +1,213 @@
+"""
+Parallel portfolio solving.
+Runs several solver configurations in separate processes, keeps the first
+answer and terminates the rest.
+"""
+import os
+import time
+import queue
+import random
+import threading
+import multiprocessing
+
+from advanced_solver import AdvancedSudokuSolver, StepLog
+
+# Engine/ordering/seed combinations tried by default. Basic backtracking is
+# available as an engine but left out here: it snapshots the grid on every
+# step, so it is slow and memory hungry on exactly the puzzles a portfolio
+# is meant for.
+DEFAULT_PORTFOLIO = [
+    {'engine': 'advanced', 'value_order': 'lcv'},
+    {'engine': 'advanced', 'value_order': 'random', 'seed': 1},
+    {'engine': 'advanced', 'value_order': 'random', 'seed': 2},
+    {'engine': 'advanced', 'value_order': 'random', 'seed': 3},
+]
+
+# Upper bound on how long a race may run, whatever the caller asks for
+DEFAULT_TIMEOUT = 30.0
+
+# Races allowed at once in this process. Each one starts up to a process per
+# CPU, so further requests run the single default engine in-process instead.
+PORTFOLIO_MAX_RACES = int(os.environ.get("PORTFOLIO_MAX_RACES", "1"))
+_race_slots = threading.BoundedSemaphore(PORTFOLIO_MAX_RACES)
+
+# Never plain fork: the calling web worker may be running threads (the AI
+# hint executor, gunicorn --threads), and forking those is unsafe
+_START_METHOD = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+
+
+def run_config(puzzle, config, record='summary', sample_every=100):
+    """Solve a puzzle with a single portfolio configuration."""
+    engine = config.get('engine', 'advanced')
+
+    if engine == 'advanced':
+        solver = AdvancedSudokuSolver(
+            value_order=config.get('value_order', 'lcv'),
+            seed=config.get('seed')
+        )
+        return solver.solve_with_heuristics([row[:] for row in puzzle], record=record, sample_every=sample_every)
+
+    if engine == 'backtracking':
+        from visualization import BacktrackingVisualizer
+
+        random.seed(config.get('seed'))
+        start_time = time.time()
+        visualizer = BacktrackingVisualizer()
+        steps, _ = visualizer.visualize_backtracking([row[:] for row in puzzle])
+        solved = all(cell != 0 for row in visualizer.grid for cell in row)
+
+        # Re-record the visualizer's steps at the requested level so both
+        # engines return the same shape
+        step_log = StepLog(record, sample_every)
+        tried = {}
+        for step in steps[1:]:
+            cell = (step['row'], step['col'])
+            if step['is_backtrack']:
+                step_log.append(*cell, tried[cell], 'backtrack', 'backtracking')
+            else:
+                tried[cell] = step['value']
+                step_log.append(*cell, step['value'], 'place', 'backtracking')
+        backtrack_count = sum(1 for s in steps if s['is_backtrack'])
+
+        return {
+            'solved': solved,
+            'grid': visualizer.grid if solved else puzzle,
+            'stats': {
+                'backtrack_count': backtrack_count,
+                'constraint_checks': None,
+                'solving_time': time.time() - start_time,
+                'steps': len(step_log),
+                'step_summary': step_log.summary(),
+                'propagated_cells': 0,
+                'searched_cells': len(steps) - 1 - backtrack_count,
+                'transposition': None
+            },
+            'record': record,
+            'steps': step_log.to_dicts()
+        }
+
+    raise ValueError(f"Unknown portfolio engine: {engine}")
+
+
+def _worker(index, puzzle, config, record, sample_every, results):
+    try:
+        results.put((index, run_config(puzzle, config, record, sample_every), None))
+    except Exception as e:
+        results.put((index, None, str(e)))
+
+
+def solve_portfolio(puzzle, configs=None, timeout=DEFAULT_TIMEOUT, max_workers=None, record='summary',
+                    sample_every=100):
+    """
+    Race several solver configurations on the same puzzle.
+
+    Args:
+        puzzle: 9x9 grid with 0 for empty cells
+        configs: list of configuration dicts (defaults to DEFAULT_PORTFOLIO)
+        timeout: seconds to wait for an answer before giving up, capped at
+            DEFAULT_TIMEOUT
+        max_workers: cap on the number of processes (defaults to CPU count)
+        record: step recording level
+        sample_every: step interval when record is 'sampled'
+
+    Returns:
+        The winning solver result, with a 'portfolio' entry describing
+        which configuration won and how long the race took
+    """
+    configs = list(configs or DEFAULT_PORTFOLIO)
+    max_workers = max_workers or os.cpu_count() or 1
+    configs = configs[:max(1, max_workers)]
+    timeout = min(timeout, DEFAULT_TIMEOUT)
+
+    if not _race_slots.acquire(blocking=False):
+        # Too many races already running here: solve with the first
+        # configuration in-process rather than starting more processes
+        start_time = time.time()
+        result = run_config(puzzle, configs[0], record, sample_every)
+        result['portfolio'] = {
+            'winner': configs[0],
+            'configs': configs[:1],
+            'wall_time': time.time() - start_time,
+            'timed_out': False,
+            'errors': [],
+            'fallback': 'busy'
+        }
+        return result
+
+    try:
+        return _race(puzzle, configs, timeout, record, sample_every)
+    finally:
+        _race_slots.release()
+
+
+def _race(puzzle, configs, timeout, record, sample_every):
+    start_time = time.time()
+    ctx = multiprocessing.get_context(_START_METHOD)
+    results = ctx.Queue()
+    processes = [
+        ctx.Process(target=_worker, args=(i, puzzle, config, record, sample_every, results), daemon=True)
+        for i, config in enumerate(configs)
+    ]
+    for process in processes:
+        process.start()
+
+    winner = None
+    result = None
+    errors = []
+    failed = set()
+    crashed = False
+    deadline = start_time + timeout
+    try:
+        # Every engine is complete, so the first answer (solved or proven
+        # unsolvable) is final. Only errors let the race continue.
+        while len(errors) < len(processes):
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                break
+            try:
+                index, outcome, error = results.get(timeout=min(remaining, 0.1))
+            except queue.Empty:
+                # Stop waiting if every process died without reporting
+                if not any(process.is_alive() for process in processes) and results.empty():
+                    crashed = True
+                    break
+                continue
+            if error is not None:
+                failed.add(index)
+                errors.append({'config': configs[index], 'error': error})
+                continue
+            winner, result = index, outcome
+            break
+    finally:
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+        for process in processes:
+            process.join()
+        results.close()
+
+    wall_time = time.time() - start_time
+
+    if crashed:
+        errors.extend(
+            {'config': configs[index], 'error': f"Process exited with code {process.exitcode} without a result"}
+            for index, process in enumerate(processes) if index not in failed
+        )
+
+    if result is None:
+        result = {
+            'solved': False,
+            'grid': puzzle,
+            'stats': {'solving_time': wall_time, 'steps': 0, 'step_summary': None},
+            'record': record,
+            'steps': []
+        }
+
+    result['portfolio'] = {
+        'winner': configs[winner] if winner is not None else None,
+        'configs': configs,
+        'wall_time': wall_time,
+        'timed_out': winner is None and not crashed and len(errors) < len(processes),
+        'errors': errors
+    }
+    return result
@@ -0,0 +1,263 @@
+"""
+Opt-in profiling for solver and generator work.
+
+Requests to decorated endpoints run under cProfile (hot functions, call
+counts) plus a stack sampler (flamegraph-compatible collapsed stacks) when
+they carry ?profile=1 and an X-Admin-Token header matching
+PROFILE_ADMIN_TOKEN. Internal calls can be wrapped with @profiled, active
+only when SMARTSUDO_PROFILE=1. Profiles are written to a bounded directory
+(PROFILE_DIR, newest PROFILE_STORE_SIZE kept) so any worker can serve them
+for download. With profiling off, the only cost is a flag check.
+"""
+import os
+import sys
+import hmac
+import json
+import time
+import pstats
+import secrets
+import tempfile
+import cProfile
+import threading
+import functools
+from collections import Counter
+
+PROFILE_ADMIN_TOKEN = os.environ.get("PROFILE_ADMIN_TOKEN")
+PROFILE_DIR = os.environ.get("PROFILE_DIR", os.path.join(tempfile.gettempdir(), "smartsudo-profiles"))
+PROFILE_STORE_SIZE = int(os.environ.get("PROFILE_STORE_SIZE", "50"))
+PROFILE_SAMPLE_INTERVAL = float(os.environ.get("PROFILE_SAMPLE_INTERVAL", "0.001"))
+PROFILE_INTERNAL = os.environ.get("SMARTSUDO_PROFILE") == "1"
+TOP_FUNCTIONS = 25
+
+
+def _frame_label(code):
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})".replace(';', ':')
+
+
+class _StackSampler(threading.Thread):
+    """Samples one thread's call stack at a fixed interval."""
+
+    def __init__(self, thread_id, interval):
+        super().__init__(daemon=True)
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                stack.append(_frame_label(frame.f_code))
+                frame = frame.f_back
+            if stack:
+                self.stacks[';'.join(reversed(stack))] += 1
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+
+# Only one cProfile may be active per process (Python 3.12+ raises on a
+# second one), so concurrent or nested captures fall back to sampling only
+_cprofile_lock = threading.Lock()
+
+
+def run_profiled(func, *args, **kwargs):
+    """
+    Call func under cProfile and the stack sampler, or the sampler alone
+    when another capture already holds cProfile.
+    Returns (result, profile) where profile holds the top functions and
+    the collapsed stacks.
+    """
+    profiler = cProfile.Profile() if _cprofile_lock.acquire(blocking=False) else None
+    sampler = _StackSampler(threading.get_ident(), PROFILE_SAMPLE_INTERVAL)
+    sampler.start()
+    start = time.perf_counter()
+    try:
+        if profiler is not None:
+            result = profiler.runcall(func, *args, **kwargs)
+        else:
+            result = func(*args, **kwargs)
+    finally:
+        duration = time.perf_counter() - start
+        sampler.stop()
+        if profiler is not None:
+            _cprofile_lock.release()
+
+    functions = []
+    total_calls = None
+    if profiler is not None:
+        stats = pstats.Stats(profiler)
+        total_calls = stats.total_calls
+        for (filename, line, name), (primitive_calls, calls, total_time, cumulative_time, _) in stats.stats.items():
+            functions.append({
+                'function': f"{name} ({os.path.basename(filename)}:{line})",
+                'calls': calls,
+                'primitive_calls': primitive_calls,
+                'total_time': total_time,
+                'cumulative_time': cumulative_time
+            })
+        functions.sort(key=lambda f: f['total_time'], reverse=True)
+
+    profile = {
+        'mode': 'cprofile+sampling' if profiler is not None else 'sampling',
+        'duration': duration,
+        'total_calls': total_calls,
+        'top_functions': functions[:TOP_FUNCTIONS],
+        'samples': sum(sampler.stacks.values()),
+        'collapsed': '\n'.join(f"{stack} {count}" for stack, count in sampler.stacks.most_common())
+    }
+    return result, profile
+
+
+def save_profile(label, profile):
+    """Write a profile to the store, evict the oldest beyond the cap, return its id."""
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    profile_id = f"{int(time.time())}-{secrets.token_hex(4)}"
+    summary = {key: value for key, value in profile.items() if key != 'collapsed'}
+    summary.update(id=profile_id, label=label, created=time.time())
+
+    with open(os.path.join(PROFILE_DIR, f"{profile_id}.collapsed"), 'w') as f:
+        f.write(profile['collapsed'])
+    with open(os.path.join(PROFILE_DIR, f"{profile_id}.json"), 'w') as f:
+        json.dump(summary, f)
+
+    stored = sorted(
+        (name for name in os.listdir(PROFILE_DIR) if name.endswith('.json')),
+        key=lambda name: os.path.getmtime(os.path.join(PROFILE_DIR, name))
+    )
+    for name in stored[:max(0, len(stored) - PROFILE_STORE_SIZE)]:
+        for suffix in ('.json', '.collapsed'):
+            try:
+                os.remove(os.path.join(PROFILE_DIR, name[:-len('.json')] + suffix))
+            except OSError:
+                pass
+
+    return profile_id
+
+
+def _valid_profile_id(profile_id):
+    return all(ch.isalnum() or ch == '-' for ch in profile_id)
+
+
+def list_profiles():
+    if not os.path.isdir(PROFILE_DIR):
+        return []
+    profiles = []
+    for name in os.listdir(PROFILE_DIR):
+        if name.endswith('.json'):
+            try:
+                with open(os.path.join(PROFILE_DIR, name)) as f:
+                    summary = json.load(f)
+            except (OSError, ValueError):
+                continue
+            profiles.append({key: summary.get(key) for key in ('id', 'label', 'created', 'duration')})
+    return sorted(profiles, key=lambda p: p['created'] or 0, reverse=True)
+
+
+def load_profile(profile_id, collapsed=False):
+    """Return a stored profile summary (or its collapsed stacks), or None."""
+    if not _valid_profile_id(profile_id):
+        return None
+    path = os.path.join(PROFILE_DIR, f"{profile_id}.{'collapsed' if collapsed else 'json'}")
+    try:
+        with open(path) as f:
+            return f.read() if collapsed else json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def is_admin_request():
+    from flask import request
+
+    token = request.headers.get('X-Admin-Token', '')
+    return bool(PROFILE_ADMIN_TOKEN) and hmac.compare_digest(token, PROFILE_ADMIN_TOKEN)
+
+
+def profile_endpoint(view):
+    """
+    Run a Flask view under the profiler for admin requests with ?profile=1.
+    The profile is stored and its id and top functions added to the JSON
+    response.
+    """
+    from flask import request, jsonify
+
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        if request.args.get('profile') != '1' or not is_admin_request():
+            return view(*args, **kwargs)
+
+        response, profile = run_profiled(view, *args, **kwargs)
+        profile_id = save_profile(request.path, profile)
+
+        status = 200
+        if isinstance(response, tuple):
+            response, status = response[0], response[1]
+        data = response.get_json(silent=True) if hasattr(response, 'get_json') else None
+        if isinstance(data, dict):
+            data['profile'] = {
+                'id': profile_id,
+                'mode': profile['mode'],
+                'duration': profile['duration'],
+                'top_functions': profile['top_functions'][:10]
+            }
+            response = jsonify(data)
+        response.status_code = status
+        response.headers['X-Profile-Id'] = profile_id
+        return response
+
+    return wrapper
+
+
+def profiled(label=None):
+    """
+    Decorator for internal calls: profile and store every call when
+    SMARTSUDO_PROFILE=1, otherwise call straight through.
+    """
+    def decorator(func):
+        name = label or func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not PROFILE_INTERNAL:
+                return func(*args, **kwargs)
+            result, profile = run_profiled(func, *args, **kwargs)
+            save_profile(name, profile)
+            return result
+
+        return wrapper
+
+    return decorator
+
+
+def register_profile_routes(app):
+    """Add admin-only routes for listing and downloading stored profiles."""
+    from flask import jsonify, Response
+
+    @app.route('/profiles')
+    def profiles_index():
+        if not is_admin_request():
+            return jsonify({'error': 'Forbidden'}), 403
+        return jsonify({'profiles': list_profiles()})
+
+    @app.route('/profiles/<profile_id>')
+    def profile_detail(profile_id):
+        if not is_admin_request():
+            return jsonify({'error': 'Forbidden'}), 403
+        summary = load_profile(profile_id)
+        if summary is None:
+            return jsonify({'error': 'No such profile'}), 404
+        return jsonify(summary)
+
+    @app.route('/profiles/<profile_id>/collapsed')
+    def profile_collapsed(profile_id):
+        if not is_admin_request():
+            return jsonify({'error': 'Forbidden'}), 403
+        collapsed = load_profile(profile_id, collapsed=True)
+        if collapsed is None:
+            return jsonify({'error': 'No such profile'}), 404
+        return Response(collapsed, mimetype='text/plain', headers={
+            'Content-Disposition': f'attachment; filename={profile_id}.collapsed'
+        })
@@ -0,0 +1,214 @@
+"""
+Memory-mapped on-disk puzzle database.
+
+One file per difficulty, made of a small header followed by fixed-size
+records, so puzzle N lives at a known offset and can be read in O(1)
+without parsing the rest of the file. Records hold the givens and the
+solution nibble-packed (41 bytes each) plus grading metadata. Files are
+opened read-only with mmap, so every worker shares the same page cache.
+
+Append puzzles from the generator with:
+    python puzzle_db.py append --dir puzzles --difficulty hard --count 10000
+"""
+import os
+import mmap
+import random
+import struct
+import argparse
+import threading
+
+from puzzle_stock import DIFFICULTIES
+
+MAGIC = b'SSDB'
+VERSION = 1
+HEADER = struct.Struct('<4sHH8x')      # magic, version, record size
+GRADE = struct.Struct('<BBHI')         # clues, reserved, searched cells, backtracks
+PACKED_GRID_SIZE = 41
+RECORD_SIZE = 2 * PACKED_GRID_SIZE + GRADE.size
+
+
+def pack_grid(grid):
+    """Pack a 9x9 grid into 41 bytes, two cells per byte (high nibble first)."""
+    cells = [cell for row in grid for cell in row] + [0]
+    return bytes((cells[i] << 4) | cells[i + 1] for i in range(0, 82, 2))
+
+
+def unpack_grid(data):
+    """Unpack 41 nibble-packed bytes into a 9x9 list grid."""
+    cells = []
+    for byte in data:
+        cells.append(byte >> 4)
+        cells.append(byte & 0x0F)
+    return [cells[r * 9:r * 9 + 9] for r in range(9)]
+
+
+def grade_puzzle(grid):
+    """Solve a puzzle and return its grade metadata."""
+    from advanced_solver import AdvancedSudokuSolver
+
+    result = AdvancedSudokuSolver().solve_with_heuristics(grid, record='none')
+    stats = result['stats']
+    return {
+        'clues': sum(1 for row in grid for cell in row if cell != 0),
+        'searched_cells': stats['searched_cells'],
+        'backtrack_count': stats['backtrack_count']
+    }
+
+
+def encode_record(grid, solution, grade):
+    return (pack_grid(grid) + pack_grid(solution) +
+            GRADE.pack(grade['clues'], 0,
+                       min(grade['searched_cells'], 0xFFFF),
+                       min(grade['backtrack_count'], 0xFFFFFFFF)))
+
+
+def decode_record(data):
+    clues, _, searched_cells, backtrack_count = GRADE.unpack_from(data, 2 * PACKED_GRID_SIZE)
+    return (
+        unpack_grid(data[:PACKED_GRID_SIZE]),
+        unpack_grid(data[PACKED_GRID_SIZE:2 * PACKED_GRID_SIZE]),
+        {'clues': clues, 'searched_cells': searched_cells, 'backtrack_count': backtrack_count}
+    )
+
+
+def database_path(directory, difficulty):
+    return os.path.join(directory, f"{difficulty}.sdb")
+
+
+def append_puzzles(path, records):
+    """
+    Append (grid, solution, grade) records to a database file, creating it
+    if needed. Returns the number of puzzles now in the file.
+    """
+    new_file = not os.path.exists(path) or os.path.getsize(path) == 0
+    with open(path, 'ab') as f:
+        if new_file:
+            f.write(HEADER.pack(MAGIC, VERSION, RECORD_SIZE))
+        for grid, solution, grade in records:
+            f.write(encode_record(grid, solution, grade))
+        size = f.tell()
+    return (size - HEADER.size) // RECORD_SIZE
+
+
+class PuzzleDatabase:
+    def __init__(self, directory):
+        self.directory = directory
+        # difficulty -> (file, mmap, puzzle count). Entries are replaced,
+        # never closed, while the database is in use: readers may still hold
+        # an older one, which the GC closes once they drop it.
+        self._maps = {}
+        self._lock = threading.Lock()
+
+    def _open(self, difficulty):
+        # Difficulty becomes part of a file path, so only known names are allowed
+        if difficulty not in DIFFICULTIES:
+            return None
+        path = database_path(self.directory, difficulty)
+        if not os.path.exists(path):
+            return None
+
+        f = open(path, 'rb')
+        size = os.fstat(f.fileno()).st_size
+        if size < HEADER.size:
+            f.close()
+            return None
+
+        data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, record_size = HEADER.unpack_from(data, 0)
+        if magic != MAGIC or version != VERSION or record_size != RECORD_SIZE:
+            data.close()
+            f.close()
+            raise ValueError(f"Not a SmartSudo puzzle database: {path}")
+
+        entry = (f, data, (size - HEADER.size) // RECORD_SIZE)
+        self._maps[difficulty] = entry
+        return entry
+
+    def _entry(self, difficulty):
+        entry = self._maps.get(difficulty)
+        if entry is not None and os.fstat(entry[0].fileno()).st_size <= len(entry[1]):
+            return entry
+        # Not mapped yet, or puzzles were appended since we mapped the file
+        with self._lock:
+            entry = self._maps.get(difficulty)
+            if entry is None or os.fstat(entry[0].fileno()).st_size > len(entry[1]):
+                entry = self._open(difficulty)
+            return entry
+
+    def count(self, difficulty):
+        """Number of puzzles stored for a difficulty."""
+        entry = self._entry(difficulty)
+        return entry[2] if entry else 0
+
+    def get(self, difficulty, number):
+        """Return (grid, solution, grade) for puzzle `number`, or None."""
+        entry = self._entry(difficulty)
+        if entry is None or not 0 <= number < entry[2]:
+            return None
+        return self._read(entry, number)
+
+    def random(self, difficulty):
+        """Return (number, grid, solution, grade) for a random puzzle, or None."""
+        entry = self._entry(difficulty)
+        if entry is None or entry[2] == 0:
+            return None
+        number = random.randrange(entry[2])
+        return (number,) + self._read(entry, number)
+
+    @staticmethod
+    def _read(entry, number):
+        offset = HEADER.size + number * RECORD_SIZE
+        return decode_record(entry[1][offset:offset + RECORD_SIZE])
+
+    def _close_entry(self, difficulty):
+        f, data, _ = self._maps.pop(difficulty)
+        data.close()
+        f.close()
+
+    def close(self):
+        """Close every map; only call once no reader is using the database."""
+        for difficulty in list(self._maps):
+            self._close_entry(difficulty)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Manage SmartSudo puzzle databases")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    append_parser = subparsers.add_parser('append', help="Generate, grade and append puzzles")
+    append_parser.add_argument('--dir', default='puzzles')
+    append_parser.add_argument('--difficulty', default='medium', choices=DIFFICULTIES)
+    append_parser.add_argument('--count', type=int, default=1000)
+    append_parser.add_argument('--seed', type=int)
+
+    info_parser = subparsers.add_parser('info', help="Show puzzle counts")
+    info_parser.add_argument('--dir', default='puzzles')
+
+    args = parser.parse_args()
+
+    if args.command == 'append':
+        from sudoku_generator import SudokuGenerator
+
+        if args.seed is not None:
+            random.seed(args.seed)
+        os.makedirs(args.dir, exist_ok=True)
+        generator = SudokuGenerator()
+
+        def records():
+            for _ in range(args.count):
+                grid, solution = generator.generate_puzzle(args.difficulty)
+                yield grid, solution, grade_puzzle(grid)
+
+        total = append_puzzles(database_path(args.dir, args.difficulty), records())
+        print(f"{args.difficulty}: {total} puzzles")
+    else:
+        database = PuzzleDatabase(args.dir)
+        for name in sorted(os.listdir(args.dir)):
+            difficulty = name[:-len('.sdb')]
+            if name.endswith('.sdb') and difficulty in DIFFICULTIES:
+                print(f"{difficulty}: {database.count(difficulty)} puzzles")
+        database.close()
+
+
+if __name__ == '__main__':
+    main()
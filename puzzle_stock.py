@@ -0,0 +1,73 @@
+"""
+Pre-generated puzzle stock for warm worker starts.
+Puzzles are stored as immutable bytes (81 givens followed by 81 solution
+digits per record) so a stock built in the gunicorn master before forking
+stays shared copy-on-write across workers. Draw counters live in shared
+memory, so each stocked puzzle is served once across all workers.
+"""
+import multiprocessing
+
+DIFFICULTIES = ('easy', 'medium', 'hard', 'expert')
+RECORD_SIZE = 162
+
+
+def encode_grid(grid):
+    """Flatten a 9x9 grid into 81 bytes."""
+    return bytes(cell for row in grid for cell in row)
+
+
+def decode_grid(data):
+    """Expand 81 bytes back into a 9x9 list grid."""
+    return [list(data[r * 9:r * 9 + 9]) for r in range(9)]
+
+
+class PuzzleStock:
+    def __init__(self, stock):
+        # difficulty -> bytes of concatenated records; never mutated
+        self._stock = stock
+        # Puzzles taken so far per difficulty, shared with forked workers
+        self._slots = {difficulty: slot for slot, difficulty in enumerate(stock)}
+        self._taken = multiprocessing.RawArray('Q', max(1, len(stock)))
+        self._lock = multiprocessing.Lock()
+
+    @classmethod
+    def build(cls, generator, count, difficulties=DIFFICULTIES):
+        """Generate `count` puzzles per difficulty with the given generator."""
+        stock = {}
+        for difficulty in difficulties:
+            records = bytearray()
+            for _ in range(count):
+                grid, solution = generator.generate_puzzle(difficulty)
+                records += encode_grid(grid)
+                records += encode_grid(solution)
+            stock[difficulty] = bytes(records)
+        return cls(stock)
+
+    def size(self, difficulty):
+        """Number of stocked puzzles for a difficulty."""
+        return len(self._stock.get(difficulty, b'')) // RECORD_SIZE
+
+    def take(self, difficulty):
+        """
+        Return the next unserved (grid, solution) pair, or None once every
+        stocked puzzle of that difficulty has been taken by any worker.
+        """
+        size = self.size(difficulty)
+        if size == 0:
+            return None
+
+        slot = self._slots[difficulty]
+        # A short timeout keeps a worker killed mid-take from blocking the
+        # others; they fall back to generating fresh puzzles
+        if not self._lock.acquire(timeout=1.0):
+            return None
+        try:
+            index = self._taken[slot]
+            if index >= size:
+                return None
+            self._taken[slot] = index + 1
+        finally:
+            self._lock.release()
+
+        record = self._stock[difficulty][index * RECORD_SIZE:(index + 1) * RECORD_SIZE]
+        return decode_grid(record[:81]), decode_grid(record[81:])
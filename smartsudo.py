@@ -0,0 +1,181 @@
+"""
+Command-line bulk generation, solving and grading.
+
+    python -m smartsudo --workers 8 generate --count 1000000 --difficulty hard --seed 42
+    python -m smartsudo --workers 8 solve puzzles.txt
+    python -m smartsudo grade puzzles.txt
+
+Puzzles are read and written one per line as 81 characters, row by row,
+with '.' (or '0') for empty cells. Each output line is the puzzle (and
+solution, where there is one) followed by space-separated key=value
+stats. Work is split into batches across worker processes and results
+are streamed in input order. Generation seeds every item from
+(seed, item number), so output is identical for any worker count.
+"""
+import sys
+import time
+import random
+import argparse
+import multiprocessing
+
+from sudoku_generator import SudokuGenerator
+from advanced_solver import AdvancedSudokuSolver
+from puzzle_stock import DIFFICULTIES
+
+
+def format_grid(grid):
+    """Format a 9x9 grid as an 81-character line."""
+    return ''.join(str(cell) if cell else '.' for row in grid for cell in row)
+
+
+def parse_grid(line):
+    """Parse an 81-character line into a 9x9 grid."""
+    line = line.strip()
+    if len(line) < 81:
+        raise ValueError(f"Expected 81 characters, got {len(line)}")
+    cells = [0 if ch in '.0' else int(ch) for ch in line[:81]]
+    return [cells[r * 9:r * 9 + 9] for r in range(9)]
+
+
+def format_stats(stats):
+    return ' '.join(f"{key}={value}" for key, value in stats.items())
+
+
+def _solver_stats(grid):
+    start = time.perf_counter()
+    result = AdvancedSudokuSolver().solve_with_heuristics(grid, record='none')
+    stats = result['stats']
+    return result, {
+        'solved': int(result['solved']),
+        'propagated': stats['propagated_cells'],
+        'searched': stats['searched_cells'],
+        'backtracks': stats['backtrack_count'],
+        'ms': round((time.perf_counter() - start) * 1000, 3)
+    }
+
+
+def generate_batch(task):
+    seed, start, stop, difficulty, grade = task
+    generator = SudokuGenerator()
+    lines = []
+    for index in range(start, stop):
+        random.seed(f"{seed}-{index}")
+        begin = time.perf_counter()
+        grid, solution = generator.generate_puzzle(difficulty)
+        stats = {
+            'n': index,
+            'clues': sum(1 for row in grid for cell in row if cell),
+            'ms': round((time.perf_counter() - begin) * 1000, 3)
+        }
+        if grade:
+            _, solver_stats = _solver_stats(grid)
+            stats.update(searched=solver_stats['searched'], backtracks=solver_stats['backtracks'])
+        lines.append(f"{format_grid(grid)} {format_grid(solution)} {format_stats(stats)}")
+    return lines
+
+
+def solve_batch(lines):
+    output = []
+    for line in lines:
+        try:
+            grid = parse_grid(line)
+        except ValueError as e:
+            output.append(f"{line.strip()} error={str(e).replace(' ', '_')}")
+            continue
+        result, stats = _solver_stats(grid)
+        output.append(f"{format_grid(grid)} {format_grid(result['grid'])} {format_stats(stats)}")
+    return output
+
+
+def grade_batch(lines):
+    output = []
+    for line in lines:
+        try:
+            grid = parse_grid(line)
+        except ValueError as e:
+            output.append(f"{line.strip()} error={str(e).replace(' ', '_')}")
+            continue
+        _, stats = _solver_stats(grid)
+        stats = {'clues': sum(1 for row in grid for cell in row if cell), **stats}
+        output.append(f"{format_grid(grid)} {format_stats(stats)}")
+    return output
+
+
+def _batched(lines, size):
+    batch = []
+    for line in lines:
+        if not line.strip():
+            continue
+        batch.append(line)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _run(func, tasks, workers, out):
+    """Map func over tasks, writing each batch of lines in order."""
+    if workers <= 1:
+        results = map(func, tasks)
+        pool = None
+    else:
+        pool = multiprocessing.Pool(workers)
+        results = pool.imap(func, tasks)
+    try:
+        for lines in results:
+            out.write('\n'.join(lines))
+            out.write('\n')
+    finally:
+        if pool is not None:
+            pool.terminate()
+            pool.join()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='smartsudo', description="Bulk Sudoku generation, solving and grading")
+    parser.add_argument('--workers', type=int, default=multiprocessing.cpu_count())
+    parser.add_argument('--batch-size', type=int, default=500)
+    parser.add_argument('--output', '-o', help="Output file (default: stdout)")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    generate_parser = subparsers.add_parser('generate', help="Generate puzzles")
+    generate_parser.add_argument('--count', type=int, default=1000)
+    generate_parser.add_argument('--difficulty', default='medium', choices=DIFFICULTIES)
+    generate_parser.add_argument('--seed', type=int, default=0)
+    generate_parser.add_argument('--grade', action='store_true', help="Also solve each puzzle and report search stats")
+
+    for name, help_text in (('solve', "Solve puzzles"), ('grade', "Grade puzzles by solver effort")):
+        command_parser = subparsers.add_parser(name, help=help_text)
+        command_parser.add_argument('input', nargs='?', default='-', help="Puzzle file (default: stdin)")
+
+    args = parser.parse_args(argv)
+    out = open(args.output, 'w') if args.output else sys.stdout
+
+    try:
+        if args.command == 'generate':
+            tasks = (
+                (args.seed, start, min(start + args.batch_size, args.count), args.difficulty, args.grade)
+                for start in range(0, args.count, args.batch_size)
+            )
+            _run(generate_batch, tasks, args.workers, out)
+        else:
+            source = sys.stdin if args.input == '-' else open(args.input)
+            try:
+                func = solve_batch if args.command == 'solve' else grade_batch
+                _run(func, _batched(source, args.batch_size), args.workers, out)
+            finally:
+                if source is not sys.stdin:
+                    source.close()
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+
+if __name__ == '__main__':
+    try:
+        main()
+    except BrokenPipeError:
+        # Output was closed early (e.g. piped into head); exit quietly
+        sys.stdout = None
+        sys.exit(1)
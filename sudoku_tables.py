@@ -0,0 +1,38 @@
+"""
+Precomputed Sudoku lookup tables in compact, immutable form.
+Cells are numbered 0-80 row by row. Tables are plain bytes so that, when
+the app is preloaded before gunicorn forks, workers share the pages
+instead of each building their own copy.
+"""
+
+def _build_units():
+    rows = [[r * 9 + c for c in range(9)] for r in range(9)]
+    cols = [[r * 9 + c for r in range(9)] for c in range(9)]
+    boxes = [[r * 9 + c for r in range(br, br + 3) for c in range(bc, bc + 3)]
+             for br in range(0, 9, 3) for bc in range(0, 9, 3)]
+    return rows + cols + boxes
+
+
+def _build_peers(units):
+    peers = []
+    for cell in range(81):
+        cell_peers = sorted({other for unit in units if cell in unit for other in unit} - {cell})
+        peers.append(cell_peers)
+    return peers
+
+
+# 27 units x 9 cells: rows 0-8, columns 9-17, boxes 18-26
+UNIT_CELLS = bytes(cell for unit in _build_units() for cell in unit)
+
+# 81 cells x 20 peers
+PEER_CELLS = bytes(peer for cell_peers in _build_peers(_build_units()) for peer in cell_peers)
+
+
+def unit_cells(unit):
+    """Cell indices of the given unit (0-26)."""
+    return UNIT_CELLS[unit * 9:unit * 9 + 9]
+
+
+def peer_cells(cell):
+    """Cell indices of the 20 peers of the given cell (0-80)."""
+    return PEER_CELLS[cell * 20:cell * 20 + 20]
@@ -0,0 +1,108 @@
+"""
+Bounded transposition table keyed by Zobrist hashes of partial grids.
+Used by AdvancedSudokuSolver to remember proven-dead positions and
+solution counts across searches.
+"""
+import random
+from array import array
+
+# One random 64-bit key per (cell, value); a grid's hash is the XOR of the
+# keys of its filled cells, so placing or clearing a cell is a single XOR.
+_rng = random.Random(0x5D0C)
+ZOBRIST = tuple(0 if value == 0 else _rng.getrandbits(64)
+                for cell in range(81) for value in range(10))
+
+
+def zobrist_key(cell, value):
+    return ZOBRIST[cell * 10 + value]
+
+
+def zobrist_hash(grid):
+    """Full Zobrist hash of a 9x9 grid."""
+    h = 0
+    for row in range(9):
+        for col in range(9):
+            if grid[row][col]:
+                h ^= ZOBRIST[(row * 9 + col) * 10 + grid[row][col]]
+    return h
+
+
+_OCCUPIED = 1
+_EXACT = 2
+
+
+class TranspositionTable:
+    # Bytes per slot: key (8) + count (4) + flags (1) + depth (1)
+    ENTRY_SIZE = 14
+
+    def __init__(self, max_bytes=1 << 20, policy='depth'):
+        """
+        Args:
+            max_bytes: memory cap; the table holds max_bytes // ENTRY_SIZE slots
+            policy: 'depth' keeps whichever of the old and new entries covers
+                more empty cells (the bigger subtree); 'always' overwrites
+        """
+        if policy not in ('depth', 'always'):
+            raise ValueError(f"Unknown replacement policy: {policy}")
+        self.policy = policy
+        self.size = max(1, max_bytes // self.ENTRY_SIZE)
+        self.keys = array('Q', bytes(8 * self.size))
+        self.counts = array('I', bytes(4 * self.size))
+        self.flags = array('B', bytes(self.size))
+        self.depths = array('B', bytes(self.size))
+        self.probes = 0
+        self.hits = 0
+        self.stores = 0
+        self.replacements = 0
+        self.rejections = 0
+
+    def lookup(self, key):
+        """Return (count, exact) for a stored position, or None."""
+        self.probes += 1
+        slot = key % self.size
+        if self.flags[slot] & _OCCUPIED and self.keys[slot] == key:
+            self.hits += 1
+            return self.counts[slot], bool(self.flags[slot] & _EXACT)
+        return None
+
+    def store(self, key, count, exact, depth):
+        """
+        Record a result for a position: `count` solutions, exact or a lower
+        bound when the search stopped at its limit. `depth` is the number
+        of empty cells, used by the replacement policy.
+        """
+        slot = key % self.size
+        if self.flags[slot] & _OCCUPIED and self.keys[slot] != key:
+            if self.policy == 'depth' and self.depths[slot] > depth:
+                self.rejections += 1
+                return
+            self.replacements += 1
+        self.stores += 1
+        self.keys[slot] = key
+        self.counts[slot] = min(count, 0xFFFFFFFF)
+        self.flags[slot] = _OCCUPIED | (_EXACT if exact else 0)
+        self.depths[slot] = depth
+
+    def counters(self):
+        return {
+            'probes': self.probes,
+            'hits': self.hits,
+            'stores': self.stores,
+            'replacements': self.replacements,
+            'rejections': self.rejections
+        }
+
+    def stats(self, since=None):
+        """
+        Table statistics. With `since` (an earlier counters() snapshot) the
+        figures cover only the work done after it, with the lifetime
+        totals under 'cumulative'.
+        """
+        current = self.counters()
+        if since is None:
+            window = dict(current, slots=self.size)
+        else:
+            window = {key: value - since[key] for key, value in current.items()}
+            window['cumulative'] = dict(current, slots=self.size)
+        window['hit_rate'] = window['hits'] / window['probes'] if window['probes'] else 0.0
+        return window